@@ -114,6 +114,7 @@ const els = {
     btnEndQuiz: $('btn-end-quiz'),
     questionType: $('question-type'),
     questionText: $('question-text'),
+    questionImages: $('question-images'),
     questionId: $('question-id'),
     optionsContainer: $('options-container'),
     feedback: $('feedback'),
@@ -151,6 +152,20 @@ function shuffle(arr) {
     return a;
 }
 
+// 解析題目圖片路徑（相對路徑以 questions/ 為基準）
+function resolveImageSrc(src) {
+    if (/^(https?:|data:|\/)/.test(src)) return src;
+    return `./questions/${src}`;
+}
+
+// 產生題目圖片 HTML（僅在題目顯示時建立，並延遲載入）
+function buildImagesHtml(q) {
+    if (!Array.isArray(q.images)) return '';
+    return q.images.map(src =>
+        `<img src="${resolveImageSrc(src)}" alt="Exhibit" loading="lazy" decoding="async">`
+    ).join('');
+}
+
 // 顯示指定畫面
 function showScreen(name) {
     ['home', 'quiz', 'result', 'review', 'view'].forEach(s => {
@@ -646,6 +661,13 @@ function renderQuestion() {
     const translatedEl = els.questionText.querySelector('.text-translated');
     originalEl.textContent = q.question;
 
+    // 圖片
+    if (els.questionImages) {
+        const imagesHtml = buildImagesHtml(q);
+        els.questionImages.innerHTML = imagesHtml;
+        els.questionImages.classList.toggle('hidden', !imagesHtml);
+    }
+
     // 選項
     els.optionsContainer.innerHTML = '';
     const letters = Object.keys(q.options).sort();
@@ -937,9 +959,12 @@ function showReview() {
             optsHtml += `<div class="review-opt ${cls}">${l}. ${q.options[l]}${marker}</div>`;
         });
 
+        const imagesHtml = buildImagesHtml(q);
+
         div.innerHTML = `
             <div class="review-q-num">題目 ${i + 1}</div>
             <div class="review-q-text">${q.question}</div>
+            ${imagesHtml ? `<div class="question-images">${imagesHtml}</div>` : ''}
             <div class="review-options">${optsHtml}</div>
             ${q.explanation ? `<div class="review-explanation">${q.explanation}</div>` : ''}
         `;
@@ -1107,6 +1132,8 @@ function showViewQuestion(question) {
         `;
     });
 
+    const imagesHtml = buildImagesHtml(question);
+
     container.innerHTML = `
         <div class="view-header">
             <span class="view-id">#${question.id || '-'}</span>
@@ -1115,6 +1142,7 @@ function showViewQuestion(question) {
         </div>
         ${practiceInfo}
         <div class="view-question-text">${question.question}</div>
+        ${imagesHtml ? `<div class="question-images">${imagesHtml}</div>` : ''}
         <div class="view-options">${optsHtml}</div>
         ${question.explanation ? `<div class="view-explanation"><i data-lucide="lightbulb"></i><span>${question.explanation}</span></div>` : ''}
     `;
@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+比對兩個版本的 JSONL 題庫，列出新增、刪除與修改的題目
+題目識別方式與前端 getQuestionKey() 相同（topic_id 或 id）
+可輸出 patch 檔，並以 apply 子指令增量套用至題庫
+"""
+
+import json
+import hashlib
+import argparse
+from pathlib import Path
+
+
+# 識別欄位，不列入內容比對
+KEY_FIELDS = ('id', 'topic')
+
+
+def js_string(value):
+    """以 JavaScript 字串轉換規則（String()）輸出 JSON 值"""
+    if value is None:
+        return 'null'
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, float):
+        if value.is_integer() and abs(value) < 1e21:
+            return str(int(value))
+        return repr(value)
+    if isinstance(value, list):
+        return ','.join('' if v is None else js_string(v) for v in value)
+    if isinstance(value, dict):
+        return '[object Object]'
+    return str(value)
+
+
+def get_question_key(q):
+    """產生題目唯一識別符（與 app.js 的 getQuestionKey 一致）
+
+    缺少 id 的題目在網頁中會全部對應到同一識別符，因此視為錯誤並拋出 ValueError。
+    """
+    if q.get('id') is None:
+        raise ValueError('題目缺少 id')
+    if q.get('topic') is not None:
+        return f"{js_string(q['topic'])}_{js_string(q['id'])}"
+    return js_string(q['id'])
+
+
+def hash_value(value):
+    """計算欄位內容雜湊（與 JSON 格式、鍵順序無關）"""
+    data = json.dumps(value, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.blake2b(data.encode('utf-8'), digest_size=8).digest()
+
+
+def hash_fields(q):
+    """計算題目各內容欄位的雜湊"""
+    return {k: hash_value(v) for k, v in q.items() if k not in KEY_FIELDS}
+
+
+def hash_question(field_hashes):
+    """由各欄位雜湊計算整題的雜湊"""
+    return hash_value({k: h.hex() for k, h in field_hashes.items()}).hex()
+
+
+def iter_jsonl(path, strict=False):
+    """逐行讀取 JSONL 題目，產生 (key, 題目)，略過空行
+
+    無效的 JSON 或非物件的行：strict 時拋出 ValueError，否則警告並略過。
+    缺少 id 的題目一律拋出 ValueError。
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            where = f'{path} 第 {line_no} 行'
+            try:
+                q = json.loads(line)
+            except json.JSONDecodeError:
+                q = None
+                problem = '不是有效的 JSON'
+            else:
+                problem = None if isinstance(q, dict) else '不是 JSON 物件'
+            if problem:
+                if strict:
+                    raise ValueError(f'{where}{problem}')
+                print(f'警告: {where}{problem}，已略過')
+                continue
+            try:
+                key = get_question_key(q)
+            except ValueError as e:
+                raise ValueError(f'{where}{e}')
+            yield key, q
+
+
+def diff_banks(old_path, new_path):
+    """比對兩個題庫，逐筆產生差異
+
+    舊題庫只保留每題各欄位的雜湊，新題庫逐行串流比對。
+    產生 (op, key, 內容) 三元組，op 為 add / remove / update：
+      add    -> 新題目完整內容
+      update -> {'fields': {欄位: 新值}, 'unset': [已移除的欄位],
+                 'base': {欄位: 舊值雜湊或 None（原本不存在）}}
+      remove -> {'base': 整題雜湊}
+    兩邊題庫若有重複的題目，皆只比對第一筆。
+    """
+    old_hashes = {}
+    for key, q in iter_jsonl(old_path):
+        if key in old_hashes:
+            print(f'警告: {old_path} 有重複的題目 {key}，僅比對第一筆')
+            continue
+        old_hashes[key] = hash_fields(q)
+
+    seen = set()
+    for key, q in iter_jsonl(new_path):
+        if key in seen:
+            print(f'警告: {new_path} 有重複的題目 {key}，僅比對第一筆')
+            continue
+        seen.add(key)
+
+        old = old_hashes.pop(key, None)
+        if old is None:
+            yield 'add', key, q
+            continue
+
+        new = hash_fields(q)
+        fields = {k: q[k] for k in new if old.get(k) != new[k]}
+        unset = sorted(k for k in old if k not in new)
+        if fields or unset:
+            base = {k: old[k].hex() if k in old else None for k in list(fields) + unset}
+            yield 'update', key, {'fields': fields, 'unset': unset, 'base': base}
+
+    for key, old in old_hashes.items():
+        yield 'remove', key, {'base': hash_question(old)}
+
+
+def load_patch(patch_path):
+    """讀取並驗證 patch 檔，任何一行有誤即拋出 ValueError
+
+    回傳 (updates, removes, adds)：updates 為 {key: 紀錄}，
+    removes 為 {key: 整題雜湊或 None}，adds 為 [(key, 題目)]。
+    """
+    updates, removes, adds = {}, {}, []
+    keys = set()
+    with open(patch_path, 'r', encoding='utf-8') as f:
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            where = f'{patch_path} 第 {line_no} 行'
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                raise ValueError(f'{where}不是有效的 JSON')
+            if not isinstance(record, dict):
+                raise ValueError(f'{where}不是 JSON 物件')
+
+            op = record.get('op')
+            key = record.get('key')
+            if op not in ('add', 'update', 'remove'):
+                raise ValueError(f'{where}的 op 無效：{op!r}')
+            if not isinstance(key, str) or not key:
+                raise ValueError(f'{where}缺少 key')
+            if key in keys:
+                raise ValueError(f'{where}的題目 {key} 重複出現')
+            keys.add(key)
+
+            if op == 'add':
+                q = record.get('question')
+                if not isinstance(q, dict):
+                    raise ValueError(f'{where}缺少 question')
+                try:
+                    q_key = get_question_key(q)
+                except ValueError as e:
+                    raise ValueError(f'{where}的 question {e}')
+                if q_key != key:
+                    raise ValueError(f'{where}的 question 與 key {key} 不符')
+                adds.append((key, q))
+            elif op == 'update':
+                fields = record.get('fields')
+                unset = record.get('unset', [])
+                base = record.get('base', {})
+                if not isinstance(fields, dict):
+                    raise ValueError(f'{where}缺少 fields')
+                if not isinstance(unset, list) or not all(isinstance(k, str) for k in unset):
+                    raise ValueError(f'{where}的 unset 必須是欄位名稱陣列')
+                if not isinstance(base, dict):
+                    raise ValueError(f'{where}的 base 必須是物件')
+                if any(k in KEY_FIELDS for k in list(fields) + unset):
+                    raise ValueError(f'{where}不可修改識別欄位 id / topic')
+                updates[key] = {'fields': fields, 'unset': unset, 'base': base}
+            else:
+                base = record.get('base')
+                if base is not None and not isinstance(base, str):
+                    raise ValueError(f'{where}的 base 必須是字串')
+                removes[key] = base
+
+    return updates, removes, adds
+
+
+def apply_patch(bank_path, patch, output_path):
+    """將 patch 套用至題庫，逐行處理並保留原有順序，新增的題目附加於最後
+
+    回傳 (counts, errors)。errors 非空代表題庫與 patch 的基準版本不符，
+    此時輸出檔內容不應被採用。
+    """
+    updates, removes, adds = patch
+    counts = {'add': 0, 'update': 0, 'remove': 0}
+    errors = []
+    seen = set()
+
+    with open(output_path, 'w', encoding='utf-8') as f:
+        for key, q in iter_jsonl(bank_path, strict=True):
+            seen.add(key)
+            if key in removes:
+                expected = removes[key]
+                if expected is not None and hash_question(hash_fields(q)) != expected:
+                    errors.append(f'題目 {key} 與 patch 的基準版本不符，無法刪除')
+                counts['remove'] += 1
+                continue
+            if key in updates:
+                update = updates[key]
+                for k, expected in update['base'].items():
+                    current = hash_value(q[k]).hex() if k in q else None
+                    if current != expected:
+                        errors.append(f'題目 {key} 的 {k} 與 patch 的基準版本不符')
+                q.update(update['fields'])
+                for k in update['unset']:
+                    q.pop(k, None)
+                counts['update'] += 1
+            f.write(json.dumps(q, ensure_ascii=False) + '\n')
+        for key, q in adds:
+            if key in seen:
+                print(f'警告: 題庫已有題目 {key}，略過新增')
+                continue
+            f.write(json.dumps(q, ensure_ascii=False) + '\n')
+            counts['add'] += 1
+
+    for key in sorted(updates.keys() - seen):
+        errors.append(f'題庫中找不到要修改的題目 {key}')
+    for key in sorted(removes.keys() - seen):
+        errors.append(f'題庫中找不到要刪除的題目 {key}')
+
+    return counts, errors
+
+
+def cmd_diff(args):
+    for path in (args.old, args.new):
+        if not Path(path).exists():
+            print(f'錯誤: 找不到 {path}')
+            return 1
+
+    added, removed, changed = [], [], []
+    field_counts = {}
+    patch = open(args.patch, 'w', encoding='utf-8') if args.patch else None
+
+    try:
+        for op, key, data in diff_banks(args.old, args.new):
+            if op == 'add':
+                added.append(key)
+                record = {'op': op, 'key': key, 'question': data}
+            elif op == 'remove':
+                removed.append(key)
+                record = {'op': op, 'key': key, **data}
+            else:
+                fields = sorted(list(data['fields']) + data['unset'])
+                changed.append((key, fields))
+                for field in fields:
+                    field_counts[field] = field_counts.get(field, 0) + 1
+                record = {'op': op, 'key': key, **data}
+            if patch:
+                patch.write(json.dumps(record, ensure_ascii=False) + '\n')
+    except ValueError as e:
+        if patch:
+            patch.close()
+            Path(args.patch).unlink()
+        print(f'錯誤: {e}')
+        return 1
+    finally:
+        if patch and not patch.closed:
+            patch.close()
+
+    print(f'新增: {len(added)} 題')
+    print(f'刪除: {len(removed)} 題')
+    print(f'修改: {len(changed)} 題')
+    for field in sorted(field_counts):
+        print(f'  {field}: {field_counts[field]} 題')
+
+    if args.verbose:
+        for key in added:
+            print(f'+ {key}')
+        for key in removed:
+            print(f'- {key}')
+        for key, fields in changed:
+            print(f"~ {key} ({', '.join(fields)})")
+
+    if args.patch:
+        print(f'已輸出 patch 至 {args.patch}')
+
+    return 0
+
+
+def cmd_apply(args):
+    for path in (args.bank, args.patch):
+        if not Path(path).exists():
+            print(f'錯誤: 找不到 {path}')
+            return 1
+
+    try:
+        patch = load_patch(args.patch)
+    except ValueError as e:
+        print(f'錯誤: {e}')
+        return 1
+
+    output_path = Path(args.output) if args.output else Path(args.bank)
+    if not output_path.parent.is_dir():
+        print(f'錯誤: 找不到 {output_path.parent}')
+        return 1
+
+    # 先寫入暫存檔，確認無誤後才取代輸出檔
+    tmp_path = output_path.with_suffix(output_path.suffix + '.tmp')
+    try:
+        counts, errors = apply_patch(args.bank, patch, tmp_path)
+        if errors:
+            for e in errors:
+                print(f'錯誤: {e}')
+            print('未寫入任何變更')
+            return 1
+        tmp_path.replace(output_path)
+    except ValueError as e:
+        print(f'錯誤: {e}')
+        return 1
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+    print(f"新增 {counts['add']} 題，修改 {counts['update']} 題，刪除 {counts['remove']} 題")
+    print(f'輸出到：{output_path}')
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='JSONL 題庫比對工具')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p_diff = sub.add_parser('diff', help='比對兩個題庫')
+    p_diff.add_argument('old', help='舊版 JSONL 路徑')
+    p_diff.add_argument('new', help='新版 JSONL 路徑')
+    p_diff.add_argument('-p', '--patch', help='輸出 patch 檔路徑')
+    p_diff.add_argument('-v', '--verbose', action='store_true', help='列出每一題的差異')
+    p_diff.set_defaults(func=cmd_diff)
+
+    p_apply = sub.add_parser('apply', help='將 patch 套用至題庫')
+    p_apply.add_argument('bank', help='題庫 JSONL 路徑')
+    p_apply.add_argument('patch', help='patch 檔路徑')
+    p_apply.add_argument('-o', '--output', help='輸出 JSONL 路徑（預設覆寫原檔）')
+    p_apply.set_defaults(func=cmd_apply)
+
+    args = parser.parse_args()
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -7,10 +7,25 @@
 
 import fitz  # PyMuPDF
 import re
+import os
 import json
+import hashlib
 import argparse
 from pathlib import Path
 
+try:
+    from PIL import Image  # 選用：有安裝 Pillow 時輸出 WebP
+except ImportError:
+    Image = None
+
+
+# 圖片標記：插入文字中以便之後對應到所屬題目，內容為圖片參照表的索引
+IMAGE_MARKER = '[[IMG:{}]]'
+IMAGE_MARKER_RE = re.compile(r'\[\[IMG:(\d+)\]\]')
+
+# 小於此尺寸的圖片視為圖示或裝飾，不擷取
+MIN_IMAGE_SIZE = 32
+
 
 def extract_text(pdf_path):
     """從 PDF 提取所有文字"""
@@ -22,6 +37,113 @@ def extract_text(pdf_path):
     return full_text
 
 
+def extract_text_with_images(pdf_path, image_dir, ref_prefix, max_size=1024, quality=80):
+    """從 PDF 提取文字，並在圖片所在位置插入圖片標記
+
+    相同內容的圖片只會儲存一次，檔名為內容雜湊值。
+    回傳 (文字, 圖片參照表)，標記中的數字為參照表索引。
+    """
+    image_dir.mkdir(parents=True, exist_ok=True)
+    doc = fitz.open(pdf_path)
+    saved = {}       # 內容雜湊 -> 圖片參照路徑
+    refs = []        # 圖片參照表
+    ref_index = {}   # 圖片參照路徑 -> 參照表索引
+    xref_refs = {}   # xref -> 圖片參照路徑（同一物件重複出現時免重新解碼）
+    full_text = ''
+
+    for page in doc:
+        images = []
+        for info in page.get_image_info(xrefs=True):
+            xref = info.get('xref')
+            if not xref:
+                continue
+            if xref not in xref_refs:
+                xref_refs[xref] = save_image(doc, xref, image_dir, ref_prefix, saved, max_size, quality)
+            ref = xref_refs[xref]
+            if ref:
+                if ref not in ref_index:
+                    ref_index[ref] = len(refs)
+                    refs.append(ref)
+                images.append((info['bbox'][1], ref_index[ref]))
+        images.sort()
+
+        # 依垂直位置將圖片標記插入文字區塊之間
+        for block in page.get_text('blocks'):
+            if block[6] != 0:
+                continue
+            while images and images[0][0] <= block[1]:
+                full_text += '\n' + IMAGE_MARKER.format(images.pop(0)[1]) + '\n'
+            full_text += block[4].rstrip('\n') + '\n'
+        for _, idx in images:
+            full_text += '\n' + IMAGE_MARKER.format(idx) + '\n'
+        full_text += '\n'
+
+    doc.close()
+    print(f'擷取圖片: {len(saved)} 張（已去除重複）')
+    return full_text, refs
+
+
+def save_image(doc, xref, image_dir, ref_prefix, saved, max_size, quality):
+    """轉存單一圖片為壓縮格式，回傳參照路徑；略過過小或無法解碼的圖片"""
+    info = doc.extract_image(xref)
+    if not info or info['width'] < MIN_IMAGE_SIZE or info['height'] < MIN_IMAGE_SIZE:
+        return None
+
+    digest = hashlib.sha1(info['image']).hexdigest()[:16]
+    if digest in saved:
+        return saved[digest]
+
+    try:
+        pix = fitz.Pixmap(doc, xref)
+        # 統一為灰階或 RGB，並套用透明遮罩（soft mask）
+        if pix.colorspace is None or pix.colorspace.n not in (1, 3):
+            pix = fitz.Pixmap(fitz.csRGB, pix)
+        if info.get('smask') and not pix.alpha:
+            pix = fitz.Pixmap(pix, fitz.Pixmap(doc, info['smask']))
+    except (RuntimeError, ValueError):
+        return None
+
+    # 透明背景合成至白色後再縮小至最長邊不超過上限尺寸
+    if Image is not None:
+        if pix.alpha:
+            img = Image.frombytes('LA' if pix.n == 2 else 'RGBA',
+                                  (pix.width, pix.height), pix.samples).convert('RGBA')
+            bg = Image.new('RGB', img.size, (255, 255, 255))
+            bg.paste(img, mask=img.getchannel('A'))
+            img = bg
+        else:
+            img = Image.frombytes('L' if pix.n == 1 else 'RGB',
+                                  (pix.width, pix.height), pix.samples)
+        img.thumbnail((max_size, max_size))
+        filename = f'{digest}.webp'
+        img.save(image_dir / filename, 'WEBP', quality=quality)
+    else:
+        if pix.alpha:
+            pix = flatten_alpha(pix)
+        longest = max(pix.width, pix.height)
+        if longest > max_size:
+            w = max(1, round(pix.width * max_size / longest))
+            h = max(1, round(pix.height * max_size / longest))
+            pix = fitz.Pixmap(pix, w, h, None)
+        filename = f'{digest}.jpg'
+        (image_dir / filename).write_bytes(pix.tobytes('jpg', jpg_quality=quality))
+
+    ref = f'{ref_prefix}/{filename}' if ref_prefix else filename
+    saved[digest] = ref
+    return ref
+
+
+def flatten_alpha(pix):
+    """將含透明通道的 Pixmap 繪製在白色頁面上，回傳不含透明通道的 Pixmap"""
+    colorspace = fitz.csGRAY if pix.n - pix.alpha == 1 else fitz.csRGB
+    tmp = fitz.open()
+    page = tmp.new_page(width=pix.width, height=pix.height)
+    page.insert_image(page.rect, pixmap=pix)
+    flat = page.get_pixmap(colorspace=colorspace, alpha=False)
+    tmp.close()
+    return flat
+
+
 def clean_text(text):
     """清理文字內容"""
     # 移除頁首
@@ -34,7 +156,7 @@ def clean_text(text):
     return text
 
 
-def parse_examsvce(full_text):
+def parse_examsvce(full_text, image_refs=None):
     """解析 ExamsVCE 格式題庫"""
     questions = []
 
@@ -53,15 +175,22 @@ def parse_examsvce(full_text):
         content = parts[i + 2]
         i += 3
 
-        q = parse_question_block(q_num, topic, content)
+        q = parse_question_block(q_num, topic, content, image_refs)
         if q:
             questions.append(q)
 
     return questions
 
 
-def parse_question_block(q_num, topic, content):
+def parse_question_block(q_num, topic, content, image_refs=None):
     """解析單一題目區塊"""
+    # 取出圖片標記並換成參照路徑（保留順序並去除重複）
+    images = []
+    if image_refs:
+        indices = dict.fromkeys(int(i) for i in IMAGE_MARKER_RE.findall(content))
+        images = [image_refs[i] for i in indices if i < len(image_refs)]
+    content = IMAGE_MARKER_RE.sub('', content)
+
     # 找答案 (支援 A-G)
     ans_match = re.search(r'Answer:\s*([A-G](?:,?\s*[A-G])*)', content, re.IGNORECASE)
     if not ans_match:
@@ -87,7 +216,7 @@ def parse_question_block(q_num, topic, content):
     # 解釋
     explanation = parse_explanation(after)
 
-    return {
+    q = {
         'id': q_num,
         'topic': topic,
         'question': question_text.strip(),
@@ -95,6 +224,9 @@ def parse_question_block(q_num, topic, content):
         'answer': valid,
         'explanation': explanation
     }
+    if images:
+        q['images'] = images
+    return q
 
 
 def extract_question_options(text):
@@ -178,6 +310,7 @@ def show_stats(questions):
     """顯示統計資訊"""
     topics = {}
     with_exp = 0
+    with_img = 0
     opt_counts = {}
 
     for q in questions:
@@ -187,6 +320,9 @@ def show_stats(questions):
         if q.get('explanation'):
             with_exp += 1
 
+        if q.get('images'):
+            with_img += 1
+
         oc = len(q['options'])
         opt_counts[oc] = opt_counts.get(oc, 0) + 1
 
@@ -195,6 +331,7 @@ def show_stats(questions):
     for t in sorted(topics.keys()):
         print(f'  Topic {t}: {topics[t]} 題')
     print(f'  有解釋: {with_exp} 題')
+    print(f'  有圖片: {with_img} 題')
     print(f'  選項數分布: {opt_counts}')
 
 
@@ -203,6 +340,12 @@ def main():
     parser.add_argument('pdf_path', help='PDF 檔案路徑')
     parser.add_argument('-o', '--output', help='輸出 JSONL 路徑')
     parser.add_argument('-v', '--verbose', action='store_true', help='詳細模式')
+    parser.add_argument('--images', action='store_true', help='擷取題目圖片')
+    parser.add_argument('--image-dir',
+                        help='圖片輸出資料夾，須位於輸出 JSONL 所在目錄之下（預設為其下的 images/）；'
+                             '部署時 JSONL 與圖片資料夾須一起放在 docs/questions/')
+    parser.add_argument('--image-max-size', type=int, default=1024, help='圖片最大邊長（像素）')
+    parser.add_argument('--image-quality', type=int, default=80, help='圖片壓縮品質（1-100）')
     args = parser.parse_args()
 
     pdf_path = Path(args.pdf_path)
@@ -210,13 +353,36 @@ def main():
         print(f'錯誤: 找不到 {pdf_path}')
         return 1
 
+    if args.image_max_size <= 0:
+        print(f'錯誤: --image-max-size 必須大於 0（目前為 {args.image_max_size}）')
+        return 1
+
+    if not 1 <= args.image_quality <= 100:
+        print(f'錯誤: --image-quality 必須介於 1-100（目前為 {args.image_quality}）')
+        return 1
+
     output_path = Path(args.output) if args.output else pdf_path.with_suffix('.jsonl')
 
+    if args.images:
+        image_dir = Path(args.image_dir) if args.image_dir else output_path.parent / 'images'
+        # 題目中記錄相對於 JSONL 所在目錄的路徑，網頁以 questions/ 為基準載入
+        ref_prefix = Path(os.path.relpath(image_dir.resolve(), output_path.parent.resolve())).as_posix()
+        if ref_prefix == '..' or ref_prefix.startswith('../'):
+            print(f'錯誤: 圖片資料夾 {image_dir} 必須位於 {output_path.parent} 之下')
+            return 1
+        if ref_prefix == '.':
+            ref_prefix = ''
+
     print(f'讀取: {pdf_path}')
-    text = extract_text(pdf_path)
+    image_refs = None
+    if args.images:
+        text, image_refs = extract_text_with_images(pdf_path, image_dir, ref_prefix,
+                                                    args.image_max_size, args.image_quality)
+    else:
+        text = extract_text(pdf_path)
     print(f'文字長度: {len(text)} 字元')
 
-    questions = parse_examsvce(text)
+    questions = parse_examsvce(text, image_refs)
     print(f'解析結果: {len(questions)} 題')
 
     if args.verbose: